@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from numba import njit
+
+@njit(cache=True, boundscheck=False)
+def paint(memory_map, starts, ends, codes, symbols):
+    """Fill each block's range of the memory map with the symbol for its status code (heaps of JIT_PAINT_MIN_SIZE+)."""
+    for i in range(starts.size):
+        symbol = symbols[codes[i]]
+        for j in range(starts[i], ends[i] + 1):
+            memory_map[j] = symbol
+
+@njit(cache=True, nogil=True)
+def mark_reachable(roots, indptr, indices, marked):
+    """Set marked[i] for every block index i reachable from the roots (heaps of JIT_MARK_MIN_BLOCKS+)."""
+    stack = np.empty(roots.size + indices.size, dtype=np.int64)
+    top = 0
+
+    for root in roots:
+        if not marked[root]:
+            marked[root] = True
+            stack[top] = root
+            top += 1
+
+    while top > 0:
+        top -= 1
+        node = stack[top]
+        for k in range(indptr[node], indptr[node + 1]):
+            target = indices[k]
+            if not marked[target]:
+                marked[target] = True
+                stack[top] = target
+                top += 1
@@ -4,6 +4,7 @@ import time
 import random
 import os
 import sys
+from functools import lru_cache
 
 # Check if Streamlit is installed
 try:
@@ -20,9 +21,49 @@ except ImportError:
     nx = None
     plt = None
 
+# Check if NumPy is installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Check if Numba is installed (compiled memory map painter for large heaps)
+try:
+    from _kernels import paint as paint_memory_map
+except ImportError:
+    paint_memory_map = None
+
+# Heaps at least this large are painted with the compiled kernel. The UIs' own
+# 100-unit heap never gets there; it only applies to larger MemorySimulator sizes
+JIT_PAINT_MIN_SIZE = 10000
+
 from memory_simulator import MemorySimulator, MemoryStatus, MemoryBlock, Generation
 from garbage_collector import GarbageCollector, GCAlgorithm
 
+# Enum members bound once at import for the comparisons in the display code
+ALLOCATED = MemoryStatus.ALLOCATED
+YOUNG = Generation.YOUNG
+
+# Display lookups by block status; a color of None means the block's own color is used
+MAP_SYMBOL_BY_STATUS = {
+    MemoryStatus.FREE: "#",
+    MemoryStatus.ALLOCATED: "#",
+    MemoryStatus.MARKED: "M",
+    MemoryStatus.GARBAGE: "G"
+}
+GRAPH_COLOR_BY_STATUS = {
+    MemoryStatus.FREE: None,
+    MemoryStatus.ALLOCATED: None,
+    MemoryStatus.MARKED: "green",
+    MemoryStatus.GARBAGE: "gray"
+}
+MEMORY_COLOR_BY_STATUS = {
+    MemoryStatus.FREE: None,
+    MemoryStatus.ALLOCATED: None,
+    MemoryStatus.MARKED: "lightgreen",
+    MemoryStatus.GARBAGE: "gray"
+}
+
 # Fallback console UI if Streamlit is not available
 class ConsoleUI:
     def __init__(self):
@@ -49,40 +90,51 @@ class ConsoleUI:
 
     def display_memory_map(self):
         """Display the memory map in console."""
-        blocks = self.memory_simulator.get_all_blocks()
+        blocks = self.memory_simulator.get_all_blocks_view()
         total_size = self.memory_simulator.total_memory_size
 
         # Create a memory map representation
-        memory_map = [" "] * total_size
+        if np is not None:
+            # Look up each block's symbol by status code, then paint it with a single slice assignment
+            arrays = self.memory_simulator.get_block_arrays()
+            symbol_table = np.zeros(len(MemoryStatus), dtype=np.uint8)
+            for status in MemoryStatus:
+                symbol_table[status] = ord(MAP_SYMBOL_BY_STATUS[status])
+
+            memory_map = np.full(total_size, ord("_"), dtype=np.uint8)
+            if paint_memory_map and total_size >= JIT_PAINT_MIN_SIZE:
+                paint_memory_map(memory_map, arrays["starts"], arrays["ends"], arrays["statuses"], symbol_table)
+            else:
+                block_symbols = symbol_table[arrays["statuses"]]
+                for start, end, symbol in zip(arrays["starts"].tolist(), arrays["ends"].tolist(), block_symbols.tolist()):
+                    memory_map[start:end + 1] = symbol
+            rows = [memory_map[i:i+50].tobytes().decode("ascii") for i in range(0, total_size, 50)]
+        else:
+            memory_map = ["_"] * total_size
+            for block in blocks:
+                symbol = MAP_SYMBOL_BY_STATUS[block.status]
 
+                # Fill the memory map with the block's symbol
+                for i in range(block.start_index, block.end_index + 1):
+                    if 0 <= i < total_size:
+                        memory_map[i] = symbol
+            rows = ["".join(memory_map[i:i+50]) for i in range(0, total_size, 50)]
+
+        # Build the memory map and block information as one buffer and write it at once
+        lines = ["", "Memory Map (# = Allocated, G = Garbage, M = Marked, _ = Free):"]
+        lines.append("0" + "_" * 48 + str(total_size))
+
+        # Memory in rows of 50 blocks
+        lines.extend(rows)
+
+        # Block information
+        lines.extend(["", "Block Information:"])
         for block in blocks:
-            # Use different symbols for different block statuses
-            symbol = "#"
-            if block.status == MemoryStatus.GARBAGE:
-                symbol = "G"
-            elif block.status == MemoryStatus.MARKED:
-                symbol = "M"
-
-            # Fill the memory map with the block's symbol
-            for i in range(block.start_index, block.end_index + 1):
-                if 0 <= i < total_size:
-                    memory_map[i] = symbol
-
-        # Display the memory map
-        print("\nMemory Map (# = Allocated, G = Garbage, M = Marked, _ = Free):")
-        print("0" + "_" * 48 + str(total_size))
-
-        # Print memory in rows of 50 blocks
-        for i in range(0, total_size, 50):
-            row = memory_map[i:min(i+50, total_size)]
-            print("".join(row))
-
-        # Print block information
-        print("\nBlock Information:")
-        for block in blocks:
-            gen_str = "Y" if block.generation == Generation.YOUNG else "O"
-            print(f"Block {block.id}: Size={block.size}, Status={block.status.name}, "
-                  f"Position={block.start_index}-{block.end_index}, Generation={gen_str}")
+            gen_str = "Y" if block.generation is YOUNG else "O"
+            lines.append(f"Block {block.id}: Size={block.size}, Status={block.status.name}, "
+                         f"Position={block.start_index}-{block.end_index}, Generation={gen_str}")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def display_statistics(self):
         """Display memory statistics."""
@@ -155,14 +207,14 @@ class ConsoleUI:
 
     def manage_references(self):
         """Add or remove references between blocks."""
-        blocks = self.memory_simulator.get_all_blocks()
+        blocks = self.memory_simulator.get_all_blocks_view()
         if not blocks:
             print("\nNo blocks available")
             return
 
         print("\nAvailable blocks:")
         for block in blocks:
-            print(f"Block {block.id}: Size={block.size}, References={block.references}")
+            print(f"Block {block.id}: Size={block.size}, References={sorted(block.references)}")
 
         print("\n1. Add reference")
         print("2. Remove reference")
@@ -196,12 +248,12 @@ class ConsoleUI:
 
     def manage_roots(self):
         """Add or remove root blocks."""
-        blocks = self.memory_simulator.get_all_blocks()
+        blocks = self.memory_simulator.get_all_blocks_view()
         if not blocks:
             print("\nNo blocks available")
             return
 
-        print("\nRoot blocks: ", self.garbage_collector.root_blocks)
+        print("\nRoot blocks: ", sorted(self.garbage_collector.root_blocks))
         print("Available blocks:")
         for block in blocks:
             print(f"Block {block.id}: Size={block.size}")
@@ -241,6 +293,7 @@ class ConsoleUI:
 
             try:
                 choice = input("Enter choice (0-9): ")
+                self.memory_simulator.tick()
 
                 if choice == "1":
                     self.allocate_memory()
@@ -270,6 +323,166 @@ class ConsoleUI:
                 print(f"Error: {e}")
 
 # Streamlit UI
+# Explanations shown for each algorithm in the sidebar selection
+ALGORITHM_DESCRIPTIONS = {
+    "Mark and Sweep": """
+**Mark and Sweep** works in two phases:
+1. **Mark Phase**: The GC identifies and marks all objects that are still in use (referenced).
+2. **Sweep Phase**: The GC scans the entire memory and reclaims any objects that are not marked.
+
+This is a simple but effective algorithm used in many programming languages.
+""",
+    "Generational": """
+**Generational GC** divides memory into regions based on object age:
+- **Young Generation**: New objects are allocated here. Most objects die young, so this region is collected frequently.
+- **Old Generation**: Objects that survive multiple young gen collections are promoted here. This region is collected less frequently.
+
+This approach is more efficient because it focuses collection efforts where they'll have the most impact.
+""",
+    "Reference Counting": """
+**Reference Counting** tracks the number of references to each object:
+- When an object's reference count drops to zero, it's immediately collected.
+- Simple to implement but struggles with cyclic references.
+- Used in languages like Python (with cycle detection), Objective-C, and PHP.
+"""
+}
+
+def make_rgba_converter():
+    """Build a color -> RGBA converter that caches results, since blocks share a small palette."""
+    return lru_cache(maxsize=256)(to_rgba)
+
+# This script is re-executed on every rerun, so the converter is kept in Streamlit's resource cache
+if st:
+    make_rgba_converter = st.cache_resource(make_rgba_converter)
+
+def draw_memory_graph(ax, blocks, root_blocks):
+    """Draw the block reference graph onto the given axes."""
+    # Create a graph
+    G = nx.DiGraph()
+
+    # Add nodes for each memory block
+    for block in blocks:
+        # Set node color based on status
+        color = GRAPH_COLOR_BY_STATUS[block.status] or block.color
+
+        # Add border for selected block
+        border = 3 if block.selected else 1
+
+        # Add node with attributes
+        G.add_node(
+            block.id,
+            size=block.size * 100,  # Scale size for visibility
+            color=color,
+            generation=block.generation.name.lower(),
+            start=block.start_index,
+            end=block.end_index,
+            border=border
+        )
+
+    # Add edges for references to blocks that are still in memory
+    live_ids = frozenset(block.id for block in blocks)
+    for block in blocks:
+        for ref_id in block.references:
+            if ref_id in live_ids:
+                G.add_edge(block.id, ref_id)
+
+    # Add root nodes (special invisible nodes that point to roots)
+    for i, root_id in enumerate(sorted(root_blocks)):
+        if root_id in live_ids:
+            root_node = f"root_{i}"
+            G.add_node(root_node, size=50, color="white", border=0)
+            G.add_edge(root_node, root_id, style="dashed")
+
+    # Create positions - memory blocks sit at their memory location, roots are spaced evenly above them
+    pos = {}
+    root_nodes = []
+    for node in G.nodes():
+        if isinstance(node, int):  # Regular memory block
+            pos[node] = (G.nodes[node]['start'], 0)
+        else:  # Root node
+            root_nodes.append(node)
+    for i, node in enumerate(root_nodes):
+        pos[node] = (100 * (i + 1) / (len(root_nodes) + 1), 1)
+
+    # Draw the graph
+    node_sizes = [G.nodes[n].get('size', 300) for n in G.nodes()]
+    node_colors = [G.nodes[n].get('color', 'blue') for n in G.nodes()]
+    linewidths = [G.nodes[n].get('border', 1) for n in G.nodes()]
+
+    nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors,
+                          linewidths=linewidths, ax=ax)
+    nx.draw_networkx_edges(G, pos, ax=ax, arrows=True, arrowstyle='->')
+    nx.draw_networkx_labels(G, pos, ax=ax)
+
+    ax.set_title("Memory Block References")
+    ax.set_axis_off()
+
+def draw_memory_strip(ax, blocks):
+    """Draw the linear memory layout onto the given axes."""
+    # Draw background for total memory
+    ax.add_patch(plt.Rectangle((0, 0), 100, 1, color='lightgray'))
+
+    # Determine each block's color based on status
+    cached_rgba = make_rgba_converter()
+    block_colors = [cached_rgba(MEMORY_COLOR_BY_STATUS[block.status] or block.color) for block in blocks]
+
+    # Draw all blocks as a single collection
+    if blocks:
+        ax.broken_barh(
+            [(block.start_index, block.size) for block in blocks],
+            (0, 1),
+            facecolors=block_colors,
+            edgecolors=block_colors,
+            linewidths=[2 if block.selected else 1 for block in blocks],
+            alpha=0.8
+        )
+
+    # Add text (ID), only for blocks big enough to fit it
+    for block in blocks:
+        if block.size >= 3:
+            ax.text(
+                block.start_index + block.size/2,
+                0.5,
+                str(block.id),
+                ha='center',
+                va='center',
+                color='black',
+                fontsize=9
+            )
+
+    # Set limits and remove axes
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 1)
+    ax.set_axis_off()
+
+def get_cached_figure(name, figsize, key, draw, *args):
+    """Get a figure kept in session state, clearing and redrawing it only when its key has changed."""
+    cached = st.session_state.get(name)
+    if cached is None or cached["figsize"] != figsize:
+        if cached is not None:
+            plt.close(cached["fig"])
+        fig, ax = plt.subplots(figsize=figsize)
+
+        # The session owns the figure, so pyplot's global figure manager must not keep it alive
+        plt.close(fig)
+        cached = {"key": None, "figsize": figsize, "fig": fig, "ax": ax}
+        st.session_state[name] = cached
+
+    if cached["key"] != key:
+        cached["ax"].clear()
+        draw(cached["ax"], *args)
+        cached["key"] = key
+
+    return cached["fig"]
+
+def get_memory_snapshot(memory_simulator):
+    """Get the block list and stats, rebuilt only when the simulator has changed since the last rerun."""
+    snapshot = st.session_state.get("memory_snapshot")
+    if snapshot is None or snapshot[0] != memory_simulator.get_version():
+        snapshot = (memory_simulator.get_version(), memory_simulator.get_all_blocks(), memory_simulator.get_stats())
+        st.session_state.memory_snapshot = snapshot
+    return snapshot[1], snapshot[2]
+
 def run_streamlit_app():
     # Set page configuration
     st.set_page_config(
@@ -285,6 +498,13 @@ def run_streamlit_app():
         st.session_state.last_gc_result = None
         st.session_state.selected_block = None
 
+    # Bind the simulator and collector once instead of going through session state each time
+    memory_simulator = st.session_state.memory_simulator
+    garbage_collector = st.session_state.garbage_collector
+
+    # Blocks allocated during this run are stamped with the time it started
+    memory_simulator.tick()
+
     # Title and description
     st.title("Garbage Collector Simulator")
     st.markdown("""
@@ -302,7 +522,7 @@ def run_streamlit_app():
             alloc_size = st.number_input("Block size", min_value=1, max_value=20, value=5)
         with col2:
             if st.button("Allocate Memory"):
-                success, block, error = st.session_state.memory_simulator.allocate_memory(alloc_size)
+                success, block, error = memory_simulator.allocate_memory(alloc_size)
                 if success:
                     st.success(f"Allocated block of size {alloc_size} (ID: {block.id})")
                 else:
@@ -326,38 +546,38 @@ def run_streamlit_app():
         }
 
         # Update algorithm when changed
-        if st.session_state.garbage_collector.get_current_algorithm() != algo_map[algorithm]:
-            st.session_state.garbage_collector.set_algorithm(algo_map[algorithm])
+        if garbage_collector.get_current_algorithm() != algo_map[algorithm]:
+            garbage_collector.set_algorithm(algo_map[algorithm])
 
         # Run GC button
         if st.button("Run Garbage Collection"):
-            st.session_state.last_gc_result = st.session_state.garbage_collector.run_garbage_collection()
+            st.session_state.last_gc_result = garbage_collector.run_garbage_collection()
             reclaimed = st.session_state.last_gc_result["reclaimed_memory"]
             duration = st.session_state.last_gc_result["duration"]
             st.success(f"GC completed in {duration:.2f} ms. Reclaimed {reclaimed} memory units.")
 
         # Auto GC settings
         st.subheader("Auto GC Settings")
-        auto_gc = st.checkbox("Enable Auto GC", value=st.session_state.garbage_collector.is_auto_gc_enabled())
-        threshold = st.slider("GC Threshold (%)", min_value=50, max_value=90, value=st.session_state.garbage_collector.get_threshold())
+        auto_gc = st.checkbox("Enable Auto GC", value=garbage_collector.is_auto_gc_enabled())
+        threshold = st.slider("GC Threshold (%)", min_value=50, max_value=90, value=garbage_collector.get_threshold())
 
         # Update auto GC settings
-        if auto_gc != st.session_state.garbage_collector.is_auto_gc_enabled():
-            st.session_state.garbage_collector.set_auto_gc(auto_gc)
+        if auto_gc != garbage_collector.is_auto_gc_enabled():
+            garbage_collector.set_auto_gc(auto_gc)
 
-        if threshold != st.session_state.garbage_collector.get_threshold():
-            st.session_state.garbage_collector.set_threshold(threshold)
+        if threshold != garbage_collector.get_threshold():
+            garbage_collector.set_threshold(threshold)
 
         # Memory utilities
         st.header("Memory Utilities")
 
         if st.button("Compact Memory"):
-            st.session_state.memory_simulator.compact_memory()
+            memory_simulator.compact_memory()
             st.success("Memory compaction completed")
 
         if st.button("Reset Memory"):
-            st.session_state.memory_simulator.reset()
-            st.session_state.garbage_collector.root_blocks = []
+            memory_simulator.reset()
+            garbage_collector.root_blocks = set()
             st.success("Memory reset completed")
 
     # Main area - split into columns
@@ -368,79 +588,15 @@ def run_streamlit_app():
         st.header("Memory Visualization")
 
         # Get all blocks
-        blocks = st.session_state.memory_simulator.get_all_blocks()
+        blocks, _ = get_memory_snapshot(memory_simulator)
 
         # If networkx is available, show graph visualization
         if nx and plt:
             st.subheader("Memory Graph")
-            fig, ax = plt.subplots(figsize=(10, 6))
-
-            # Create a graph
-            G = nx.DiGraph()
-
-            # Add nodes for each memory block
-            for block in blocks:
-                # Set node color based on status and generation
-                if block.status == MemoryStatus.GARBAGE:
-                    color = "gray"
-                elif block.status == MemoryStatus.MARKED:
-                    color = "green"
-                else:  # ALLOCATED
-                    color = block.color
-
-                # Add border for selected block
-                border = 3 if block.selected else 1
-
-                # Add node with attributes
-                G.add_node(
-                    block.id,
-                    size=block.size * 100,  # Scale size for visibility
-                    color=color,
-                    generation=block.generation.value,
-                    start=block.start_index,
-                    end=block.end_index,
-                    border=border
-                )
-
-            # Add edges for references
-            for block in blocks:
-                for ref_id in block.references:
-                    if st.session_state.memory_simulator.get_block_by_id(ref_id):
-                        G.add_edge(block.id, ref_id)
-
-            # Add root nodes (special invisible nodes that point to roots)
-            for i, root_id in enumerate(st.session_state.garbage_collector.root_blocks):
-                if st.session_state.memory_simulator.get_block_by_id(root_id):
-                    root_node = f"root_{i}"
-                    G.add_node(root_node, size=50, color="white", border=0)
-                    G.add_edge(root_node, root_id, style="dashed")
-
-            # Create positions - try to position nodes based on their memory location
-            pos = {}
-            for node in G.nodes():
-                if isinstance(node, int):  # Regular memory block
-                    block = st.session_state.memory_simulator.get_block_by_id(node)
-                    if block:
-                        pos[node] = (block.start_index, 0)
-                else:  # Root node
-                    pos[node] = (random.uniform(0, 100), 1)
-
-            # Use spring layout for the rest
-            remaining_pos = nx.spring_layout(G.subgraph([n for n in G.nodes() if n not in pos]), seed=42)
-            pos.update(remaining_pos)
-
-            # Draw the graph
-            node_sizes = [G.nodes[n].get('size', 300) for n in G.nodes()]
-            node_colors = [G.nodes[n].get('color', 'blue') for n in G.nodes()]
-            linewidths = [G.nodes[n].get('border', 1) for n in G.nodes()]
-
-            nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors,
-                                  linewidths=linewidths, ax=ax)
-            nx.draw_networkx_edges(G, pos, ax=ax, arrows=True, arrowstyle='->')
-            nx.draw_networkx_labels(G, pos, ax=ax)
-
-            plt.title("Memory Block References")
-            ax.set_axis_off()
+            # Redraw only when the memory state or the root set has changed
+            graph_key = (memory_simulator.get_version(), frozenset(garbage_collector.root_blocks))
+            fig = get_cached_figure("memory_graph", (10, 6), graph_key, draw_memory_graph,
+                                    blocks, garbage_collector.root_blocks)
 
             # Display the graph
             st.pyplot(fig)
@@ -449,51 +605,8 @@ def run_streamlit_app():
         st.subheader("Memory Blocks")
 
         # Draw a visual representation of memory
-        memory_fig, memory_ax = plt.subplots(figsize=(10, 3))
-
-        # Draw background for total memory
-        memory_ax.add_patch(plt.Rectangle((0, 0), 100, 1, color='lightgray'))
-
-        # Draw blocks
-        for block in blocks:
-            # Determine color based on status
-            if block.status == MemoryStatus.GARBAGE:
-                color = 'gray'
-            elif block.status == MemoryStatus.MARKED:
-                color = 'lightgreen'
-            else:
-                color = block.color
-
-            # Get RGB values from the hex color
-            rgba_color = to_rgba(color)
-
-            # Draw the block
-            memory_ax.add_patch(plt.Rectangle(
-                (block.start_index, 0),
-                block.size,
-                1,
-                color=rgba_color,
-                alpha=0.8,
-                linewidth=2 if block.selected else 1,
-                edgecolor='black'
-            ))
-
-            # Add text (ID)
-            if block.size >= 3:  # Only add ID if block is big enough
-                memory_ax.text(
-                    block.start_index + block.size/2,
-                    0.5,
-                    str(block.id),
-                    ha='center',
-                    va='center',
-                    color='black',
-                    fontsize=9
-                )
-
-        # Set limits and remove axes
-        memory_ax.set_xlim(0, 100)
-        memory_ax.set_ylim(0, 1)
-        memory_ax.set_axis_off()
+        memory_fig = get_cached_figure("memory_strip", (10, 3), memory_simulator.get_version(),
+                                       draw_memory_strip, blocks)
 
         # Display the memory visualization
         st.pyplot(memory_fig)
@@ -502,49 +615,47 @@ def run_streamlit_app():
         st.subheader("Block Operations")
 
         # Show block selection
-        block_options = {f"Block {b.id} (Size: {b.size})": b.id for b in blocks}
+        block_options = [(b.id, f"Block {b.id} (Size: {b.size})") for b in blocks]
         if block_options:
-            selected_option = st.selectbox("Select block:", options=list(block_options.keys()))
-            selected_id = block_options[selected_option]
+            selected_id, _ = st.selectbox("Select block:", options=block_options, format_func=lambda option: option[1])
 
             # Get the selected block
-            selected_block = st.session_state.memory_simulator.get_block_by_id(selected_id)
-            st.session_state.memory_simulator.select_block(selected_id)
+            selected_block = memory_simulator.get_block_by_id(selected_id)
+            memory_simulator.select_block(selected_id)
 
             # Display block details
             if selected_block:
                 st.session_state.selected_block = selected_block
-                st.write(f"Status: {selected_block.status.value}")
+                st.write(f"Status: {selected_block.status.name.lower()}")
                 st.write(f"Size: {selected_block.size} units")
                 st.write(f"Position: {selected_block.start_index} - {selected_block.end_index}")
-                st.write(f"Generation: {selected_block.generation.value}")
-                st.write(f"References: {selected_block.references}")
+                st.write(f"Generation: {selected_block.generation.name.lower()}")
+                st.write(f"References: {sorted(selected_block.references)}")
 
                 # Action buttons for the selected block
                 col_a, col_b, col_c = st.columns(3)
 
                 with col_a:
-                    if selected_block.status == MemoryStatus.ALLOCATED:
+                    if selected_block.status is ALLOCATED:
                         if st.button("Mark as Garbage"):
-                            st.session_state.memory_simulator.mark_as_garbage(selected_id)
+                            memory_simulator.mark_as_garbage(selected_id)
 
                 with col_b:
-                    root_status = selected_id in st.session_state.garbage_collector.root_blocks
+                    root_status = selected_id in garbage_collector.root_blocks
 
                     if root_status:
                         if st.button("Remove from Roots"):
-                            st.session_state.garbage_collector.remove_root(selected_id)
+                            garbage_collector.remove_root(selected_id)
                     else:
                         if st.button("Add as Root"):
-                            st.session_state.garbage_collector.add_root(selected_id)
+                            garbage_collector.add_root(selected_id)
 
                 with col_c:
                     # Reference management
                     if len(blocks) > 1:
-                        ref_options = {f"Block {b.id}": b.id for b in blocks if b.id != selected_id}
+                        ref_options = [b.id for b in blocks if b.id != selected_id]
                         if ref_options:
-                            ref_selection = st.selectbox("Reference to:", options=list(ref_options.keys()))
-                            ref_id = ref_options[ref_selection]
+                            ref_id = st.selectbox("Reference to:", options=ref_options, format_func=lambda block_id: f"Block {block_id}")
 
                             has_ref = ref_id in selected_block.references
 
@@ -552,11 +663,11 @@ def run_streamlit_app():
                             with col_ref1:
                                 if not has_ref:
                                     if st.button("Add Reference"):
-                                        st.session_state.memory_simulator.add_reference(selected_id, ref_id)
+                                        memory_simulator.add_reference(selected_id, ref_id)
                             with col_ref2:
                                 if has_ref:
                                     if st.button("Remove Reference"):
-                                        st.session_state.memory_simulator.remove_reference(selected_id, ref_id)
+                                        memory_simulator.remove_reference(selected_id, ref_id)
         else:
             st.info("No memory blocks allocated yet. Use the 'Allocate Memory' button to create some.")
 
@@ -564,8 +675,9 @@ def run_streamlit_app():
     with col2:
         st.header("Memory Statistics")
 
-        # Get memory stats
-        stats = st.session_state.memory_simulator.get_stats()
+        # Get memory stats (copied, since the GC results are added below)
+        _, stats = get_memory_snapshot(memory_simulator)
+        stats = dict(stats)
 
         # Update GC stats if we have a result
         if st.session_state.last_gc_result:
@@ -588,41 +700,27 @@ def run_streamlit_app():
         # Algorithm information
         st.subheader("Current Algorithm: " + algorithm)
 
-        if algorithm == "Mark and Sweep":
-            st.markdown("""
-            **Mark and Sweep** works in two phases:
-            1. **Mark Phase**: The GC identifies and marks all objects that are still in use (referenced).
-            2. **Sweep Phase**: The GC scans the entire memory and reclaims any objects that are not marked.
-
-            This is a simple but effective algorithm used in many programming languages.
-            """)
-        elif algorithm == "Generational":
-            st.markdown("""
-            **Generational GC** divides memory into regions based on object age:
-            - **Young Generation**: New objects are allocated here. Most objects die young, so this region is collected frequently.
-            - **Old Generation**: Objects that survive multiple young gen collections are promoted here. This region is collected less frequently.
-
-            This approach is more efficient because it focuses collection efforts where they'll have the most impact.
-            """)
-        elif algorithm == "Reference Counting":
-            st.markdown("""
-            **Reference Counting** tracks the number of references to each object:
-            - When an object's reference count drops to zero, it's immediately collected.
-            - Simple to implement but struggles with cyclic references.
-            - Used in languages like Python (with cycle detection), Objective-C, and PHP.
-            """)
-
-    # Automatically run GC if needed
-    if st.session_state.garbage_collector.is_auto_gc_enabled():
-        result = st.session_state.garbage_collector.check_and_run_auto_gc()
+        st.markdown(ALGORITHM_DESCRIPTIONS[algorithm])
+
+    # Automatically run GC if needed, using the stats above to skip the check while below the threshold
+    memory_usage_percent = stats["used_memory"] / stats["total_memory"] * 100
+    if garbage_collector.is_auto_gc_enabled() and memory_usage_percent >= garbage_collector.get_threshold():
+        result = garbage_collector.check_and_run_auto_gc()
         if result:
             st.session_state.last_gc_result = result
-            st.experimental_rerun()
+            # Only redraw if memory changed, otherwise every rerun would trigger another GC
+            if result["reclaimed_blocks"]:
+                st.session_state.rerun_pending = True
 
     # Add a footer
     st.markdown("---")
     st.markdown("Garbage Collector Simulator - A visual tool for understanding memory management")
 
+    # Rerun once at the end so the page shows the memory state after automatic GC
+    if st.session_state.pop("rerun_pending", False):
+        rerun = getattr(st, "rerun", None) or st.experimental_rerun
+        rerun()
+
 if __name__ == "__main__":
     # Try to run the Streamlit app if Streamlit is available
     if st:
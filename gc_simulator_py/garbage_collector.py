@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
 
 import time
+from collections import deque
 from enum import Enum
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from memory_simulator import MemorySimulator, MemoryBlock, MemoryStatus, Generation
 
+# Check if Numba is installed (compiled mark phase for large heaps)
+try:
+    import numpy as np
+    from _kernels import mark_reachable
+except ImportError:
+    mark_reachable = None
+
+# Heaps with at least this many blocks are marked with the compiled kernel. The UIs'
+# 100-unit heap holds at most 100 blocks, so this only applies to library use with large heaps
+JIT_MARK_MIN_BLOCKS = 512
+
 class GCAlgorithm(Enum):
     MARK_SWEEP = "mark_sweep"
     GENERATIONAL = "generational"
@@ -16,8 +28,9 @@ class GarbageCollector:
         self.algorithm = GCAlgorithm.MARK_SWEEP
         self.threshold = 70  # Default: run GC when memory is 70% full
         self.auto_gc = False
-        self.root_blocks = []  # IDs of blocks that are considered "roots" (always reachable)
+        self.root_blocks: Set[int] = set()  # IDs of blocks that are considered "roots" (always reachable)
         self.young_gen_max_age = 5  # 5 seconds in the young generation
+        self._gc_counter = 0  # Number of generational collections run, used to schedule major GCs
 
     def set_algorithm(self, algorithm: GCAlgorithm) -> None:
         """Set the garbage collection algorithm."""
@@ -45,17 +58,17 @@ class GarbageCollector:
 
     def add_root(self, block_id: int) -> bool:
         """Add a block to the root set."""
-        if block_id not in self.root_blocks:
-            self.root_blocks.append(block_id)
-            return True
-        return False
+        if block_id in self.root_blocks:
+            return False
+        self.root_blocks.add(block_id)
+        return True
 
     def remove_root(self, block_id: int) -> bool:
         """Remove a block from the root set."""
-        if block_id in self.root_blocks:
-            self.root_blocks.remove(block_id)
-            return True
-        return False
+        if block_id not in self.root_blocks:
+            return False
+        self.root_blocks.discard(block_id)
+        return True
 
     def check_and_run_auto_gc(self) -> Optional[Dict]:
         """Check if GC should run automatically and run it if needed."""
@@ -95,121 +108,115 @@ class GarbageCollector:
 
     def mark_and_sweep(self) -> List[MemoryBlock]:
         """Implement the mark and sweep algorithm."""
-        reclaimed_blocks = []
-        all_blocks = self.memory_simulator.get_all_blocks()
-
-        # Mark phase: Mark all blocks that are reachable from roots
-        if self.root_blocks:
-            # If we have explicit roots, use them
-            reachable = self._find_reachable_blocks(self.root_blocks)
-
-            # Mark all reachable blocks
-            for block in all_blocks:
-                if block.id in reachable:
-                    self.memory_simulator.mark_block(block.id)
-                elif block.status == MemoryStatus.ALLOCATED:
-                    # If a block is allocated but not reachable, mark it as garbage
-                    block.status = MemoryStatus.GARBAGE
+        garbage_ids = set()
+        all_blocks = tuple(self.memory_simulator.get_all_blocks_view())
+
+        # Mark phase: find all blocks reachable from roots. If no roots are defined,
+        # every allocated block is treated as live (referenced from somewhere).
+        # Large heaps are marked by the compiled kernel into a mask over all_blocks
+        has_roots = bool(self.root_blocks)
+        if has_roots:
+            if mark_reachable and len(all_blocks) >= JIT_MARK_MIN_BLOCKS:
+                reachable_mask = self._mark_reachable_mask(self.root_blocks).tolist()
+            else:
+                # Blocks reached by this collection carry its epoch, so no marks need clearing.
+                # Once every block in memory is reached there is nothing left to find
+                epoch = self.memory_simulator.next_mark_epoch()
+                self._mark_reachable_blocks(self.root_blocks, epoch, stop_after=len(all_blocks))
+                reachable_mask = (block.mark_epoch == epoch for block in all_blocks)
         else:
-            # If no roots are defined, mark all allocated blocks
-            # (simulating that all are referenced from somewhere)
-            for block in all_blocks:
-                if block.status == MemoryStatus.ALLOCATED:
-                    self.memory_simulator.mark_block(block.id)
-
-        # Sweep phase: Reclaim all garbage blocks
-        blocks_copy = all_blocks.copy()  # Copy to avoid modification during iteration
-        for block in blocks_copy:
-            if block.status == MemoryStatus.GARBAGE:
-                if self.memory_simulator.free_block(block.id):
-                    reclaimed_blocks.append(block)
+            reachable_mask = [False] * len(all_blocks)
 
-        # Reset all marked blocks back to allocated
-        for block in self.memory_simulator.get_all_blocks():
-            if block.status == MemoryStatus.MARKED:
+        # Sweep phase, in the same pass: collect garbage and unreachable blocks, keep the rest allocated
+        for block, is_reachable in zip(all_blocks, reachable_mask):
+            if is_reachable:
+                block.status = MemoryStatus.ALLOCATED
+            elif block.status == MemoryStatus.GARBAGE or (has_roots and
+                                                        block.status == MemoryStatus.ALLOCATED):
+                block.status = MemoryStatus.GARBAGE
+                garbage_ids.add(block.id)
+            elif block.status == MemoryStatus.MARKED:
                 block.status = MemoryStatus.ALLOCATED
 
-        return reclaimed_blocks
+        # Blocks were updated directly rather than through the simulator's mutators
+        self.memory_simulator.mark_modified()
+
+        return self.memory_simulator.free_blocks_bulk(garbage_ids)
 
     def generational_gc(self) -> List[MemoryBlock]:
         """Implement generational garbage collection."""
-        reclaimed_blocks = []
-        all_blocks = self.memory_simulator.get_all_blocks()
+        all_blocks = tuple(self.memory_simulator.get_all_blocks_view())
         current_time = time.time()
 
         # First, promote any young objects that have survived long enough
-        for block in all_blocks:
-            if (block.generation == Generation.YOUNG and
-                block.status == MemoryStatus.ALLOCATED and
-                current_time - block.allocation_time > self.young_gen_max_age):
-                self.memory_simulator.promote_to_old_generation(block.id)
+        self.memory_simulator.promote_young_survivors(current_time - self.young_gen_max_age)
 
         # Young generation collection (minor GC) - collect all garbage in young generation
-        blocks_copy = all_blocks.copy()
-        for block in blocks_copy:
-            if (block.generation == Generation.YOUNG and
-                block.status == MemoryStatus.GARBAGE):
-                if self.memory_simulator.free_block(block.id):
-                    reclaimed_blocks.append(block)
+        young_garbage_ids = {block.id for block in all_blocks
+                             if block.generation == Generation.YOUNG and block.status == MemoryStatus.GARBAGE}
+        reclaimed_blocks = self.memory_simulator.free_blocks_bulk(young_garbage_ids)
 
-        # Occasionally do a full collection (major GC) - 25% chance each time
-        should_run_major_gc = (time.time() * 100) % 100 < 25  # Simple deterministic "random"
+        # Occasionally do a full collection (major GC) - every 4th collection
+        self._gc_counter += 1
+        should_run_major_gc = (self._gc_counter & 3) == 0
 
         if should_run_major_gc:
-            blocks_copy = self.memory_simulator.get_all_blocks()
-            for block in blocks_copy:
-                if (block.generation == Generation.OLD and
-                    block.status == MemoryStatus.GARBAGE):
-                    if self.memory_simulator.free_block(block.id):
-                        reclaimed_blocks.append(block)
+            old_garbage_ids = {block.id for block in all_blocks
+                               if block.generation == Generation.OLD and block.status == MemoryStatus.GARBAGE}
+            reclaimed_blocks.extend(self.memory_simulator.free_blocks_bulk(old_garbage_ids))
 
         return reclaimed_blocks
 
     def reference_counting_gc(self) -> List[MemoryBlock]:
         """Implement reference counting garbage collection."""
-        reclaimed_blocks = []
-        all_blocks = self.memory_simulator.get_all_blocks()
-
-        # Find blocks with no references (excluding roots)
-        for block in all_blocks:
-            has_references = False
+        all_blocks = tuple(self.memory_simulator.get_all_blocks_view())
 
-            # Check if this block is referenced by any other block
-            for other_block in all_blocks:
-                if block.id in other_block.references:
-                    has_references = True
-                    break
+        garbage_ids = set()
+        get_reference_count = self.memory_simulator.get_reference_count
 
-            # Check if it's a root block
-            if block.id in self.root_blocks:
-                has_references = True
+        # Find blocks with no references (excluding roots) using the simulator's reference counts,
+        # collecting them together with the blocks already marked as garbage
+        for block in all_blocks:
+            has_references = get_reference_count(block.id) > 0 or block.id in self.root_blocks
 
             # If no references and not already marked as garbage, mark it as garbage
             if not has_references and block.status == MemoryStatus.ALLOCATED:
                 block.status = MemoryStatus.GARBAGE
-
-        # Reclaim all garbage blocks
-        blocks_copy = all_blocks.copy()
-        for block in blocks_copy:
             if block.status == MemoryStatus.GARBAGE:
-                if self.memory_simulator.free_block(block.id):
-                    reclaimed_blocks.append(block)
+                garbage_ids.add(block.id)
 
-        return reclaimed_blocks
-
-    def _find_reachable_blocks(self, root_ids: List[int]) -> Set[int]:
-        """Find all blocks reachable from the given roots."""
-        reachable = set(root_ids)
-        queue = root_ids.copy()
-
-        while queue:
-            block_id = queue.pop(0)
-            block = self.memory_simulator.get_block_by_id(block_id)
-
-            if block:
-                for ref_id in block.references:
-                    if ref_id not in reachable:
-                        reachable.add(ref_id)
-                        queue.append(ref_id)
-
-        return reachable
+        # Reclaim all garbage blocks
+        return self.memory_simulator.free_blocks_bulk(garbage_ids)
+
+    def _mark_reachable_blocks(self, root_ids: Iterable[int], epoch: int, stop_after: Optional[int] = None) -> int:
+        """Stamp epoch on the blocks reachable from the given roots and return how many were reached."""
+        queue = deque()
+        for block in map(self.memory_simulator.get_block_by_id, root_ids):
+            if block and block.mark_epoch != epoch:
+                block.mark_epoch = epoch
+                queue.append(block)
+        reached = len(queue)
+
+        # Stop early once stop_after blocks have been reached
+        get_block_by_id = self.memory_simulator.get_block_by_id
+        while queue and reached != stop_after:
+            block = queue.popleft()
+            for ref_id in block.references:
+                ref_block = get_block_by_id(ref_id)
+                if ref_block and ref_block.mark_epoch != epoch:
+                    ref_block.mark_epoch = epoch
+                    queue.append(ref_block)
+                    reached += 1
+
+        return reached
+
+    def _mark_reachable_mask(self, root_ids: Iterable[int]) -> Any:
+        """Get a boolean mask over memory_blocks positions of the blocks reachable from the given roots."""
+        ids, indptr, indices = self.memory_simulator.get_reference_graph()
+
+        index_by_id = {block_id: i for i, block_id in enumerate(ids.tolist())}
+        roots = np.array([index_by_id[root_id] for root_id in root_ids if root_id in index_by_id], dtype=np.int64)
+
+        marked = np.zeros(len(ids), dtype=np.bool_)
+        mark_reachable(roots, indptr, indices, marked)
+        return marked
@@ -1,62 +1,105 @@
 #!/usr/bin/env python3
 
-import random
+import bisect
 import time
-from enum import Enum
-from typing import Dict, List, Optional, Tuple, Any
-
-class MemoryStatus(Enum):
-    FREE = "free"
-    ALLOCATED = "allocated"
-    MARKED = "marked"
-    GARBAGE = "garbage"
-
-class Generation(Enum):
-    YOUNG = "young"
-    OLD = "old"
+from collections import deque
+from enum import IntEnum
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Any
+
+# NumPy is optional; it is only needed for the array views of the heap
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Integer-valued so status checks are plain int comparisons and the values
+# can index lookup tables and the array views returned by get_block_arrays()
+class MemoryStatus(IntEnum):
+    FREE = 0
+    ALLOCATED = 1
+    MARKED = 2
+    GARBAGE = 3
+
+class Generation(IntEnum):
+    YOUNG = 0
+    OLD = 1
+
+# Block colors, assigned round-robin by block ID
+PALETTE = (
+    "#FF6B6B", "#4ECDC4", "#FF9F1C", "#3BCEAC", "#6A0572",
+    "#4D80E4", "#FF7A5A", "#5D5C61", "#938BA1", "#7AC74F",
+    "#F4D35E", "#EE6055", "#60D394", "#AAF683", "#FFD97D"
+)
 
 class MemoryBlock:
-    def __init__(self, block_id: int, size: int, start_index: int):
+    __slots__ = ("id", "size", "status", "start_index", "end_index", "color",
+                 "generation", "allocation_time", "references", "selected", "mark_epoch")
+
+    def __init__(self, block_id: int, size: int, start_index: int, alloc_time: Optional[float] = None):
         self.id = block_id
         self.size = size
         self.status = MemoryStatus.ALLOCATED
         self.start_index = start_index
         self.end_index = start_index + size - 1
-        self.color = self._generate_random_color()
+        self.color = PALETTE[block_id % len(PALETTE)]
         self.generation = Generation.YOUNG
-        self.allocation_time = time.time()
-        self.references = []  # IDs of blocks this block references
+        self.allocation_time = time.time() if alloc_time is None else alloc_time
+        self.references: Set[int] = set()  # IDs of blocks this block references
         self.selected = False
-
-    def _generate_random_color(self) -> str:
-        """Generate a random color in hex format."""
-        colors = [
-            "#FF6B6B", "#4ECDC4", "#FF9F1C", "#3BCEAC", "#6A0572",
-            "#4D80E4", "#FF7A5A", "#5D5C61", "#938BA1", "#7AC74F",
-            "#F4D35E", "#EE6055", "#60D394", "#AAF683", "#FFD97D"
-        ]
-        return random.choice(colors)
+        self.mark_epoch = 0  # Epoch of the last mark and sweep collection that reached this block
 
     def add_reference(self, block_id: int) -> None:
         """Add a reference to another block."""
-        if block_id not in self.references:
-            self.references.append(block_id)
+        self.references.add(block_id)
 
     def remove_reference(self, block_id: int) -> None:
         """Remove a reference to another block."""
-        if block_id in self.references:
-            self.references.remove(block_id)
+        self.references.discard(block_id)
 
 class MemorySimulator:
+    __slots__ = ("total_memory_size", "memory_blocks", "_blocks_by_id", "_ref_counts", "_used_memory",
+                 "_free_intervals", "_young_fifo", "_young_fifo_dead", "next_block_id", "_now", "_version", "_block_arrays", "_reference_graph",
+                 "_needs_compaction", "_mark_epoch")
+
     def __init__(self, total_size: int = 100):
         self.total_memory_size = total_size
-        self.memory_blocks = []  # List of MemoryBlock objects
+        self.memory_blocks = []  # List of MemoryBlock objects, always kept sorted by start_index
+        self._blocks_by_id = {}  # Block ID -> MemoryBlock, kept in sync with memory_blocks
+        self._ref_counts = {}  # Block ID -> number of references to it from blocks in memory
+        self._used_memory = 0  # Total size of the blocks in memory
+        self._free_intervals = [(0, total_size)]  # Sorted, coalesced (start, end) free ranges, end exclusive
+        self._young_fifo = deque()  # Young blocks in allocation order; freed and promoted ones are skipped lazily
+        self._young_fifo_dead = 0  # Freed or promoted blocks still in _young_fifo
         self.next_block_id = 1
+        self._now = None  # Clock reading stamped on new blocks after tick(); None reads the clock per block
+        self._version = 0  # Bumped on every mutation so callers can cache derived views
+        self._block_arrays = None  # (version, arrays) built by get_block_arrays()
+        self._reference_graph = None  # (version, ids, indptr, indices) built by get_reference_graph()
+        self._needs_compaction = False  # Set when freeing a block leaves a gap
+        self._mark_epoch = 0  # Last epoch handed out by next_mark_epoch(), never reused
 
     def reset(self) -> None:
         """Reset the memory simulation."""
         self.memory_blocks = []
+        self._blocks_by_id = {}
+        self._ref_counts = {}
+        self._used_memory = 0
+        self._free_intervals = [(0, self.total_memory_size)]
+        self._young_fifo.clear()
+        self._young_fifo_dead = 0
         self.next_block_id = 1
+        self._needs_compaction = False
+        self._version += 1
+
+    def next_mark_epoch(self) -> int:
+        """Get a new mark epoch, distinct from every epoch already stamped on this simulator's blocks."""
+        self._mark_epoch += 1
+        return self._mark_epoch
+
+    def tick(self) -> float:
+        """Stamp allocations until the next tick() with one clock reading and return it."""
+        self._now = time.time()
+        return self._now
 
     def allocate_memory(self, size: int) -> Tuple[bool, Optional[MemoryBlock], Optional[str]]:
         """Allocate a new memory block with the given size."""
@@ -76,13 +119,19 @@ class MemorySimulator:
         if start_index == -1:
             return False, None, "Memory too fragmented. Try compacting memory or freeing some blocks."
 
+        self._take_free_space(start_index, size)
+        self._used_memory += size
+
         # Create a new memory block
-        new_block = MemoryBlock(self.next_block_id, size, start_index)
+        new_block = MemoryBlock(self.next_block_id, size, start_index, self._now)
         self.next_block_id += 1
 
         # Insert the block at the correct position
         insert_index = self._find_insert_index(start_index)
         self.memory_blocks.insert(insert_index, new_block)
+        self._blocks_by_id[new_block.id] = new_block
+        self._young_fifo.append(new_block)
+        self._version += 1
 
         return True, new_block, None
 
@@ -91,37 +140,98 @@ class MemorySimulator:
         block = self.get_block_by_id(block_id)
         if block and block.status == MemoryStatus.ALLOCATED:
             block.status = MemoryStatus.GARBAGE
+            self._version += 1
             return True
         return False
 
     def free_block(self, block_id: int) -> bool:
         """Remove a block from memory."""
-        for i, block in enumerate(self.memory_blocks):
-            if block.id == block_id:
-                self.memory_blocks.pop(i)
-                return True
+        block = self._blocks_by_id.pop(block_id, None)
+        if block:
+            self.memory_blocks.remove(block)
+            self._release_free_space(block.start_index, block.end_index + 1)
+            self._used_memory -= block.size
+
+            # The block's outgoing references go away with it
+            for ref_id in block.references:
+                self._decrement_ref_count(ref_id)
+            self._ref_counts.pop(block_id, None)
+
+            if block.generation == Generation.YOUNG:
+                self._discard_young_blocks(1)
+
+            self._needs_compaction = True
+            self._version += 1
+            return True
         return False
 
+    def free_blocks_bulk(self, block_ids: Set[int]) -> List[MemoryBlock]:
+        """Remove all blocks with the given IDs from memory in one pass and return them."""
+        kept = []
+        reclaimed = []
+        free_intervals = []
+        free_start = 0
+
+        # Split the blocks and rebuild the free list from the gaps between the kept ones
+        for block in self.memory_blocks:
+            if block.id in block_ids:
+                reclaimed.append(block)
+            else:
+                if block.start_index > free_start:
+                    free_intervals.append((free_start, block.start_index))
+                free_start = block.end_index + 1
+                kept.append(block)
+
+        if not reclaimed:
+            return reclaimed
+
+        if free_start < self.total_memory_size:
+            free_intervals.append((free_start, self.total_memory_size))
+        self.memory_blocks = kept
+        self._free_intervals = free_intervals
+
+        for block in reclaimed:
+            del self._blocks_by_id[block.id]
+            self._used_memory -= block.size
+
+            # The block's outgoing references go away with it
+            for ref_id in block.references:
+                self._decrement_ref_count(ref_id)
+        for block in reclaimed:
+            self._ref_counts.pop(block.id, None)
+        self._discard_young_blocks(sum(1 for block in reclaimed if block.generation == Generation.YOUNG))
+
+        self._needs_compaction = True
+        self._version += 1
+        return reclaimed
+
     def mark_block(self, block_id: int) -> bool:
         """Mark a block as in use."""
         block = self.get_block_by_id(block_id)
         if block and (block.status == MemoryStatus.ALLOCATED or block.status == MemoryStatus.GARBAGE):
             block.status = MemoryStatus.MARKED
+            self._version += 1
             return True
         return False
 
     def compact_memory(self) -> None:
         """Reorganize memory blocks to eliminate fragmentation."""
-        # Sort blocks by start_index
-        self.memory_blocks.sort(key=lambda block: block.start_index)
+        # First-fit allocation never leaves gaps, so memory is already compact until a block is freed
+        if not self._needs_compaction:
+            return
 
-        # Relocate blocks to eliminate fragmentation
+        # Relocate blocks (already in start_index order) to eliminate fragmentation
         current_index = 0
         for block in self.memory_blocks:
             block.start_index = current_index
             block.end_index = current_index + block.size - 1
             current_index += block.size
 
+        # All free memory is now one range at the end
+        self._free_intervals = [(current_index, self.total_memory_size)] if current_index < self.total_memory_size else []
+        self._needs_compaction = False
+        self._version += 1
+
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about memory usage."""
         used_memory = self.get_used_memory()
@@ -137,30 +247,82 @@ class MemorySimulator:
             "memory_reclaimed": 0   # Will be set by GC
         }
 
+    def mark_modified(self) -> None:
+        """Record a change made directly to block state, e.g. by a garbage collector."""
+        self._version += 1
+
+    def get_version(self) -> int:
+        """Get a counter that changes whenever the memory state is modified."""
+        return self._version
+
     def get_all_blocks(self) -> List[MemoryBlock]:
         """Get all memory blocks."""
         return self.memory_blocks.copy()
 
+    def get_all_blocks_view(self) -> Sequence[MemoryBlock]:
+        """Get all memory blocks without copying. Read-only; it changes as memory is modified."""
+        return self.memory_blocks
+
+    def get_block_arrays(self) -> Dict[str, Any]:
+        """Get block starts, ends and statuses as parallel NumPy arrays, ordered like memory_blocks (shared, do not modify)."""
+        if np is None:
+            raise ImportError("NumPy is required for get_block_arrays()")
+
+        if self._block_arrays is None or self._block_arrays[0] != self._version:
+            # Read each block once, then split the columns into contiguous arrays
+            fields = np.array([(block.start_index, block.end_index, block.status) for block in self.memory_blocks],
+                              dtype=np.int32).reshape(-1, 3)
+            starts, ends, statuses = np.ascontiguousarray(fields.T)
+            self._block_arrays = (self._version, {"starts": starts, "ends": ends, "statuses": statuses})
+
+        return self._block_arrays[1]
+
+    def get_reference_graph(self) -> Tuple[Any, Any, Any]:
+        """Get the references as a CSR adjacency over memory_blocks positions: (ids, indptr, indices)."""
+        if np is None:
+            raise ImportError("NumPy is required for get_reference_graph()")
+
+        if self._reference_graph is None or self._reference_graph[0] != self._version:
+            index_by_id = {block.id: i for i, block in enumerate(self.memory_blocks)}
+            indptr = np.zeros(len(self.memory_blocks) + 1, dtype=np.int64)
+            indices = []
+
+            # References to blocks that are no longer in memory are dropped
+            for i, block in enumerate(self.memory_blocks):
+                indices.extend(index_by_id[ref_id] for ref_id in block.references if ref_id in index_by_id)
+                indptr[i + 1] = len(indices)
+
+            ids = np.fromiter(index_by_id, dtype=np.int32, count=len(index_by_id))
+            self._reference_graph = (self._version, ids, indptr, np.array(indices, dtype=np.int64))
+
+        return self._reference_graph[1:]
+
     def get_block_by_id(self, block_id: int) -> Optional[MemoryBlock]:
         """Get a memory block by its ID."""
-        for block in self.memory_blocks:
-            if block.id == block_id:
-                return block
-        return None
+        return self._blocks_by_id.get(block_id)
 
     def select_block(self, block_id: int) -> None:
         """Select a block (for UI interactions)."""
+        changed = False
         for block in self.memory_blocks:
-            block.selected = False
+            if block.selected and block.id != block_id:
+                block.selected = False
+                changed = True
 
         block = self.get_block_by_id(block_id)
-        if block:
+        if block and not block.selected:
             block.selected = True
+            changed = True
+
+        if changed:
+            self._version += 1
 
     def deselect_all_blocks(self) -> None:
         """Deselect all blocks."""
         for block in self.memory_blocks:
-            block.selected = False
+            if block.selected:
+                block.selected = False
+                self._version += 1
 
     def get_selected_block(self) -> Optional[MemoryBlock]:
         """Get the currently selected block."""
@@ -174,16 +336,44 @@ class MemorySimulator:
         block = self.get_block_by_id(block_id)
         if block and block.generation == Generation.YOUNG:
             block.generation = Generation.OLD
+            self._discard_young_blocks(1)
+            self._version += 1
             return True
         return False
 
+    def promote_young_survivors(self, cutoff: float) -> int:
+        """Promote allocated young blocks allocated before cutoff to the old generation and return how many."""
+        young_fifo = self._young_fifo
+        retained = []
+        promoted = 0
+
+        # Only the blocks old enough to promote are visited, oldest first
+        while young_fifo and young_fifo[0].allocation_time < cutoff:
+            block = young_fifo.popleft()
+            if block.generation != Generation.YOUNG or self._blocks_by_id.get(block.id) is not block:
+                self._young_fifo_dead -= 1  # Already promoted or freed
+                continue
+            if block.status == MemoryStatus.ALLOCATED:
+                block.generation = Generation.OLD
+                promoted += 1
+            else:
+                retained.append(block)  # Promoted by a later collection if it is allocated again
+
+        young_fifo.extendleft(reversed(retained))
+        if promoted:
+            self._version += 1
+        return promoted
+
     def add_reference(self, from_id: int, to_id: int) -> bool:
         """Add a reference from one block to another."""
         from_block = self.get_block_by_id(from_id)
         to_block = self.get_block_by_id(to_id)
 
         if from_block and to_block:
-            from_block.add_reference(to_id)
+            if to_id not in from_block.references:
+                from_block.add_reference(to_id)
+                self._ref_counts[to_id] = self._ref_counts.get(to_id, 0) + 1
+            self._version += 1
             return True
         return False
 
@@ -192,48 +382,75 @@ class MemorySimulator:
         from_block = self.get_block_by_id(from_id)
 
         if from_block:
-            from_block.remove_reference(to_id)
+            if to_id in from_block.references:
+                from_block.remove_reference(to_id)
+                self._decrement_ref_count(to_id)
+            self._version += 1
             return True
         return False
 
+    def get_reference_count(self, block_id: int) -> int:
+        """Get the number of blocks in memory that reference the given block."""
+        return self._ref_counts.get(block_id, 0)
+
+    def _decrement_ref_count(self, block_id: int) -> None:
+        """Drop one reference to a block from the reference counts."""
+        count = self._ref_counts.get(block_id, 0)
+        if count > 1:
+            self._ref_counts[block_id] = count - 1
+        else:
+            self._ref_counts.pop(block_id, None)
+
     def get_used_memory(self) -> int:
         """Get the amount of used memory."""
-        return sum(block.size for block in self.memory_blocks)
+        return self._used_memory
 
     def get_free_memory(self) -> int:
         """Get the amount of free memory."""
-        return self.total_memory_size - self.get_used_memory()
+        return self.total_memory_size - self._used_memory
 
     def _find_free_space_index(self, size: int) -> int:
         """Find the starting index for a new block of the given size."""
-        if not self.memory_blocks:
-            return 0  # Memory is completely empty
-
-        # Sort blocks by start_index
-        sorted_blocks = sorted(self.memory_blocks, key=lambda block: block.start_index)
-
-        # Check for space at the beginning
-        if sorted_blocks[0].start_index >= size:
-            return 0
-
-        # Check for space between blocks
-        for i in range(len(sorted_blocks) - 1):
-            current_block = sorted_blocks[i]
-            next_block = sorted_blocks[i + 1]
-            gap_size = next_block.start_index - (current_block.end_index + 1)
-
-            if gap_size >= size:
-                return current_block.end_index + 1
-
-        # Check for space at the end
-        last_block = sorted_blocks[-1]
-        remaining_space = self.total_memory_size - (last_block.end_index + 1)
-
-        if remaining_space >= size:
-            return last_block.end_index + 1
+        # First fit: the lowest free range that is large enough
+        for start, end in self._free_intervals:
+            if end - start >= size:
+                return start
 
         return -1  # No suitable space found
 
+    def _take_free_space(self, start_index: int, size: int) -> None:
+        """Remove a newly allocated range from the front of its free range."""
+        i = bisect.bisect_left(self._free_intervals, (start_index,))
+        _, end = self._free_intervals[i]
+        if start_index + size < end:
+            self._free_intervals[i] = (start_index + size, end)
+        else:
+            del self._free_intervals[i]
+
+    def _release_free_space(self, start: int, end: int) -> None:
+        """Return a freed range to the free list, merging it with adjacent free ranges."""
+        intervals = self._free_intervals
+        i = bisect.bisect_left(intervals, (start,))
+
+        if i < len(intervals) and intervals[i][0] == end:
+            end = intervals[i][1]
+            del intervals[i]
+        if i > 0 and intervals[i - 1][1] == start:
+            start = intervals[i - 1][0]
+            i -= 1
+            del intervals[i]
+
+        intervals.insert(i, (start, end))
+
+    def _discard_young_blocks(self, count: int) -> None:
+        """Record young blocks that left the young generation, compacting the queue once most entries are dead."""
+        self._young_fifo_dead += count
+        if self._young_fifo_dead * 2 > len(self._young_fifo):
+            blocks_by_id = self._blocks_by_id
+            self._young_fifo = deque(block for block in self._young_fifo
+                                     if block.generation == Generation.YOUNG and blocks_by_id.get(block.id) is block)
+            self._young_fifo_dead = 0
+
     def _find_insert_index(self, start_index: int) -> int:
         """Find the index to insert a new block at."""
         for i, block in enumerate(self.memory_blocks):
@@ -246,26 +463,7 @@ class MemorySimulator:
         if len(self.memory_blocks) <= 1:
             return 0  # No fragmentation with 0 or 1 blocks
 
-        # Sort blocks by start_index
-        sorted_blocks = sorted(self.memory_blocks, key=lambda block: block.start_index)
-
-        # Calculate total gaps between blocks
-        total_gap_size = 0
-
-        # Gap at the beginning
-        total_gap_size += sorted_blocks[0].start_index
-
-        # Gaps between blocks
-        for i in range(len(sorted_blocks) - 1):
-            current_block = sorted_blocks[i]
-            next_block = sorted_blocks[i + 1]
-            gap_size = next_block.start_index - (current_block.end_index + 1)
-            total_gap_size += max(0, gap_size)
-
-        # Gap at the end
-        last_block = sorted_blocks[-1]
-        total_gap_size += self.total_memory_size - (last_block.end_index + 1)
-
-        # Calculate fragmentation as percentage of free memory that's fragmented
-        free_memory = self.get_free_memory()
-        return round((total_gap_size / free_memory) * 100) if free_memory else 0
+        # The gaps before, between and after the blocks always add up to exactly the free
+        # memory, so all free memory counts as fragmented. This matches the original
+        # gap-summing metric, which reported 100% whenever any memory was free
+        return 100 if self.get_free_memory() else 0
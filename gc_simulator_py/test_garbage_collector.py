@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+import random
+import time
+import unittest
+from unittest import mock
+
+import garbage_collector
+from garbage_collector import GarbageCollector, GCAlgorithm
+from memory_simulator import MemorySimulator, MemoryStatus, Generation
+
+# Naive reference implementations of the simulator and collectors. They work on plain
+# dicts with linear scans only, so they share none of the simulator's indexes and caches
+
+def copy_blocks(simulator):
+    """Copy the simulator's blocks into plain dicts, in memory order."""
+    return [{"id": block.id, "start": block.start_index, "size": block.size, "status": block.status,
+             "generation": block.generation, "time": block.allocation_time, "refs": set(block.references)}
+            for block in simulator.memory_blocks]
+
+def block_state(blocks):
+    """Get the comparable state of dict blocks: (id, start, status, generation) in memory order."""
+    return [(b["id"], b["start"], b["status"], b["generation"]) for b in blocks]
+
+def simulator_state(simulator):
+    """Get the comparable state of the simulator's blocks: (id, start, status, generation) in memory order."""
+    return [(b.id, b.start_index, b.status, b.generation) for b in simulator.memory_blocks]
+
+def reference_first_fit(blocks, size, total_size):
+    """Find the first gap between dict blocks that fits size, or -1."""
+    start = 0
+    for b in sorted(blocks, key=lambda b: b["start"]):
+        if b["start"] - start >= size:
+            return start
+        start = b["start"] + b["size"]
+    return start if total_size - start >= size else -1
+
+def reference_fragmentation(blocks, total_size):
+    """Calculate fragmentation by summing the gaps around dict blocks, as the original simulator did."""
+    if len(blocks) <= 1:
+        return 0
+    gaps = blocks[0]["start"]
+    for prev, b in zip(blocks, blocks[1:]):
+        gaps += max(0, b["start"] - (prev["start"] + prev["size"]))
+    gaps += total_size - (blocks[-1]["start"] + blocks[-1]["size"])
+    free = total_size - sum(b["size"] for b in blocks)
+    return round(gaps / free * 100) if free else 0
+
+def reference_mark_and_sweep(blocks, roots):
+    """Mark from the roots, then free garbage and unreachable allocated blocks."""
+    if roots:
+        by_id = {b["id"]: b for b in blocks}
+        reachable = set(roots)
+        stack = list(roots)
+        while stack:
+            block = by_id.get(stack.pop())
+            for ref_id in block["refs"] if block else ():
+                if ref_id not in reachable:
+                    reachable.add(ref_id)
+                    stack.append(ref_id)
+        for b in blocks:
+            if b["id"] in reachable:
+                b["status"] = MemoryStatus.ALLOCATED
+            elif b["status"] == MemoryStatus.ALLOCATED:
+                b["status"] = MemoryStatus.GARBAGE
+
+    reclaimed = [b["id"] for b in blocks if b["status"] == MemoryStatus.GARBAGE]
+    for b in blocks:
+        if b["status"] == MemoryStatus.MARKED:
+            b["status"] = MemoryStatus.ALLOCATED
+    return reclaimed, [b for b in blocks if b["status"] != MemoryStatus.GARBAGE]
+
+def reference_generational(blocks, now, max_age, major):
+    """Promote old enough allocated young blocks, then free young (and on a major GC, old) garbage."""
+    for b in blocks:
+        if (b["generation"] == Generation.YOUNG and b["status"] == MemoryStatus.ALLOCATED and
+                now - b["time"] > max_age):
+            b["generation"] = Generation.OLD
+
+    reclaimed = [b["id"] for b in blocks
+                 if b["generation"] == Generation.YOUNG and b["status"] == MemoryStatus.GARBAGE]
+    if major:
+        reclaimed += [b["id"] for b in blocks
+                      if b["generation"] == Generation.OLD and b["status"] == MemoryStatus.GARBAGE]
+    return reclaimed, [b for b in blocks if b["id"] not in reclaimed]
+
+def reference_reference_counting(blocks, roots):
+    """Turn unreferenced, non-root allocated blocks into garbage, then free all garbage."""
+    referenced = set()
+    for b in blocks:
+        referenced |= b["refs"]
+    for b in blocks:
+        if b["id"] not in referenced and b["id"] not in roots and b["status"] == MemoryStatus.ALLOCATED:
+            b["status"] = MemoryStatus.GARBAGE
+
+    reclaimed = [b["id"] for b in blocks if b["status"] == MemoryStatus.GARBAGE]
+    return reclaimed, [b for b in blocks if b["status"] != MemoryStatus.GARBAGE]
+
+class GarbageCollectorTest(unittest.TestCase):
+    def setUp(self):
+        # Drive every clock read from a fake clock, in half-second steps so ages can land exactly on the limit
+        self.clock = 1000.0
+        patcher = mock.patch.object(time, "time", lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check_invariants(self, simulator):
+        """Check the simulator's derived structures against a recomputation from its blocks."""
+        blocks = simulator.memory_blocks
+        self.assertEqual(simulator._blocks_by_id, {b.id: b for b in blocks})
+        self.assertEqual(simulator.get_used_memory(), sum(b.size for b in blocks))
+
+        # Blocks are sorted, in bounds and never overlap; the free list is exactly the gaps
+        gaps = []
+        start = 0
+        for b in blocks:
+            self.assertGreaterEqual(b.start_index, start)
+            self.assertEqual(b.end_index, b.start_index + b.size - 1)
+            if b.start_index > start:
+                gaps.append((start, b.start_index))
+            start = b.end_index + 1
+        self.assertLessEqual(start, simulator.total_memory_size)
+        if start < simulator.total_memory_size:
+            gaps.append((start, simulator.total_memory_size))
+        self.assertEqual(simulator._free_intervals, gaps)
+
+        # Reference counts only count references from blocks in memory
+        counts = {}
+        for b in blocks:
+            for ref_id in b.references:
+                counts[ref_id] = counts.get(ref_id, 0) + 1
+        for b in blocks:
+            self.assertEqual(simulator.get_reference_count(b.id), counts.get(b.id, 0))
+
+        # Every live young block is queued once, and the dead entry count is exact
+        live = [b for b in simulator._young_fifo
+                if b.generation == Generation.YOUNG and simulator._blocks_by_id.get(b.id) is b]
+        self.assertEqual(sorted(b.id for b in live), sorted(b.id for b in blocks if b.generation == Generation.YOUNG))
+        self.assertEqual(simulator._young_fifo_dead, len(simulator._young_fifo) - len(live))
+
+        if garbage_collector.mark_reachable:
+            ids, indptr, indices = simulator.get_reference_graph()
+            self.assertEqual(ids.tolist(), [b.id for b in blocks])
+            for i, b in enumerate(blocks):
+                targets = {ids[j] for j in indices[indptr[i]:indptr[i + 1]].tolist()}
+                self.assertEqual(targets, {ref_id for ref_id in b.references if ref_id in simulator._blocks_by_id})
+
+    def run_collection(self, collector, algorithm):
+        """Run one collection and check it against the reference implementation."""
+        simulator = collector.memory_simulator
+        blocks = copy_blocks(simulator)
+        roots = set(collector.root_blocks)
+
+        if algorithm == GCAlgorithm.MARK_SWEEP:
+            expected = reference_mark_and_sweep(blocks, roots)
+        elif algorithm == GCAlgorithm.GENERATIONAL:
+            # Major collections run on every 4th generational collection
+            major = (collector._gc_counter + 1) % 4 == 0
+            expected = reference_generational(blocks, self.clock, collector.young_gen_max_age, major)
+        else:
+            expected = reference_reference_counting(blocks, roots)
+
+        collector.set_algorithm(algorithm)
+        result = collector.run_garbage_collection()
+        self.assertEqual([b.id for b in result["reclaimed_blocks"]], expected[0])
+        self.assertEqual(simulator_state(simulator), block_state(expected[1]))
+
+    def test_random_operations_match_reference(self):
+        for seed in range(40):
+            rnd = random.Random(seed)
+            simulator = MemorySimulator(200)
+            collector = GarbageCollector(simulator)
+
+            for _ in range(150):
+                self.clock += rnd.choice([0, 0.5, 1, 2.5])
+                ids = [b.id for b in simulator.memory_blocks]
+                r = rnd.random()
+                if r < 0.3 or not ids:
+                    size = rnd.randint(1, 12)
+                    expected_start = reference_first_fit(copy_blocks(simulator), size, 200)
+                    success, block, _ = simulator.allocate_memory(size)
+                    self.assertEqual(block.start_index if success else -1, expected_start)
+                elif r < 0.45:
+                    simulator.add_reference(rnd.choice(ids), rnd.choice(ids))
+                elif r < 0.5:
+                    simulator.remove_reference(rnd.choice(ids), rnd.choice(ids))
+                elif r < 0.58:
+                    simulator.mark_as_garbage(rnd.choice(ids))
+                elif r < 0.62:
+                    simulator.mark_block(rnd.choice(ids))
+                elif r < 0.66:
+                    simulator.promote_to_old_generation(rnd.choice(ids))
+                elif r < 0.7:
+                    simulator.free_block(rnd.choice(ids))
+                elif r < 0.76:
+                    collector.add_root(rnd.choice(ids))
+                elif r < 0.78:
+                    collector.remove_root(rnd.choice(sorted(collector.root_blocks) or ids))
+                elif r < 0.8:
+                    sizes = [b.size for b in simulator.memory_blocks]
+                    simulator.compact_memory()
+                    self.assertEqual([b.start_index for b in simulator.memory_blocks],
+                                     [sum(sizes[:i]) for i in range(len(sizes))])
+                elif r < 0.81:
+                    simulator.reset()
+                    collector.root_blocks = set()
+                else:
+                    self.run_collection(collector, rnd.choice(list(GCAlgorithm)))
+
+                self.assertEqual(simulator.calculate_fragmentation(),
+                                 reference_fragmentation(copy_blocks(simulator), 200))
+                self.check_invariants(simulator)
+
+    def test_large_heap_mark_and_sweep_matches_reference(self):
+        # Large enough for the compiled mark kernel when Numba is installed
+        rnd = random.Random(1)
+        simulator = MemorySimulator(5000)
+        collector = GarbageCollector(simulator)
+        ids = [simulator.allocate_memory(rnd.randint(1, 5))[1].id for _ in range(1200)]
+        for _ in range(1000):
+            simulator.add_reference(rnd.choice(ids), rnd.choice(ids))
+        for block_id in rnd.sample(ids, 50):
+            simulator.free_block(block_id)
+        for block in rnd.sample(simulator.memory_blocks, 100):
+            block.status = rnd.choice([MemoryStatus.GARBAGE, MemoryStatus.MARKED])
+        simulator.mark_modified()
+        for block_id in rnd.sample(ids, 30):
+            collector.add_root(block_id)
+
+        self.assertGreaterEqual(len(simulator.memory_blocks), garbage_collector.JIT_MARK_MIN_BLOCKS)
+        self.run_collection(collector, GCAlgorithm.MARK_SWEEP)
+        self.check_invariants(simulator)
+
+    def test_collectors_sharing_a_simulator(self):
+        simulator = MemorySimulator(100)
+        a = simulator.allocate_memory(5)[1]
+        b = simulator.allocate_memory(5)[1]
+        simulator.add_reference(a.id, b.id)
+        first = GarbageCollector(simulator)
+        first.add_root(a.id)
+        self.run_collection(first, GCAlgorithm.MARK_SWEEP)
+
+        # A block reached only through blocks the first collector marked must survive the second
+        c = simulator.allocate_memory(5)[1]
+        simulator.add_reference(b.id, c.id)
+        second = GarbageCollector(simulator)
+        second.add_root(a.id)
+        self.run_collection(second, GCAlgorithm.MARK_SWEEP)
+        self.assertIs(simulator.get_block_by_id(c.id), c)
+
+    def test_young_queue_stays_bounded(self):
+        simulator = MemorySimulator(100)
+        collector = GarbageCollector(simulator)
+        for _ in range(1000):
+            block = simulator.allocate_memory(10)[1]
+            simulator.mark_as_garbage(block.id)
+            collector.run_garbage_collection()
+        self.assertLessEqual(len(simulator._young_fifo), 2)
+        self.check_invariants(simulator)
+
+if __name__ == "__main__":
+    unittest.main()